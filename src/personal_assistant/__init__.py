@@ -3,4 +3,10 @@ from .addressbook import (
 )
 from .notes import (
     NotesBook, Note
+)
+from .dedupe import (
+    MergeGroup, build_merge_plan, apply_merge_plan
+)
+from .scheduler import (
+    BirthdayScheduler, BirthdayDigest, SchedulerState, StdoutSink, FileSink
 )
\ No newline at end of file
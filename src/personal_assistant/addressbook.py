@@ -1,4 +1,5 @@
 from collections import UserDict
+from contextlib import contextmanager
 from datetime import datetime, date
 import re
 
@@ -65,6 +66,21 @@ class Birthday(Field):
         """Повертає дату як об’єкт date."""
         return datetime.strptime(self.value, self.FORMAT).date()
 
+    def days_until(self, today: date) -> int:
+        """Кількість днів до найближчого ДН (29.02 у невисокосний рік — 28.02)."""
+        born = self.as_date
+
+        def in_year(year: int) -> date:
+            try:
+                return born.replace(year=year)
+            except ValueError:
+                return date(year, 2, 28)
+
+        bd = in_year(today.year)
+        if bd < today:
+            bd = in_year(today.year + 1)
+        return (bd - today).days
+
 
 # ----- Запис і книга -----
 
@@ -76,33 +92,65 @@ class Record:
         self.phones: list[Phone] = []
         self.email: Email | None = None
         self.birthday: Birthday | None = None
+        self._book: "AddressBook | None" = None  # книга, що індексує запис
+
+    # --- pickle: зворотне посилання на книгу не зберігається ---
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("_book", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._book = None
+
+    @contextmanager
+    def _reindexing(self):
+        """Оновлює індекси книги навколо зміни полів запису."""
+        book = self._book
+        if book is not None:
+            book._unindex(self)
+        try:
+            yield
+        finally:
+            if book is not None:
+                book._index(self)
 
     # --- телефони ---
     def add_phone(self, phone: Phone) -> None:
         if any(p.value == phone.value for p in self.phones):
             raise ValueError("Такий номер уже додано до цього контакту.")
-        self.phones.append(phone)
+        with self._reindexing():
+            self.phones.append(phone)
 
     def remove_phone(self, phone_value: str) -> None:
-        self.phones = [p for p in self.phones if p.value != phone_value]
+        with self._reindexing():
+            self.phones = [p for p in self.phones if p.value != phone_value]
 
     def edit_phone(self, old_value: str, new_value: str) -> None:
         """Редагує існуючий номер телефону."""
         for i, p in enumerate(self.phones):
             if p.value == old_value:
-                self.phones[i] = Phone(new_value)
+                new_phone = Phone(new_value)
+                with self._reindexing():
+                    self.phones[i] = new_phone
                 return
         raise ValueError("Телефон не знайдено у контакті.")
 
     # --- інші поля ---
     def set_email(self, email: Email) -> None:
-        self.email = email
+        with self._reindexing():
+            self.email = email
 
     def set_address(self, address: Address) -> None:
-        self.address = address
+        with self._reindexing():
+            self.address = address
 
     def set_birthday(self, birthday: Birthday) -> None:
-        self.birthday = birthday
+        with self._reindexing():
+            self.birthday = birthday
+        if self._book is not None:
+            self._book._birthdays_changed()
 
     # --- подання ---
     def __str__(self) -> str:
@@ -116,18 +164,112 @@ class Record:
 
 
 class AddressBook(UserDict):
-    """Колекція контактів із пошуком і перевірками унікальності."""
-    
+    """Колекція контактів із пошуком і перевірками унікальності.
+
+    Вторинні індекси (ключ → множина імен) оновлюються методами CRUD книги
+    та сетерами ``Record``:
+      • phone   — номер телефону;
+      • domain  — домен email у нижньому регістрі;
+      • address — слова адреси у нижньому регістрі;
+      • has     — наявність поля (phone, email, address, birthday).
+
+    Підписники (``subscribe``) отримують каскадні події про контакти:
+    ``rename_contact(old, new)`` — при перейменуванні або злитті,
+    ``remove_contact(name)`` — при видаленні. Так, наприклад, ``NotesBook``
+    оновлює зв’язки нотаток. Підписники не зберігаються разом з книгою.
+    """
+    INDEXES = ("phone", "domain", "address", "has")
+    HAS_FIELDS = ("phone", "email", "address", "birthday")
+    QUERY_FIELDS = ("email", "address", "phone", "has")
+    TOKEN_RE = re.compile(r"\w+")
+
+    def __init__(self, *args, **kwargs):
+        self._indexes: dict[str, dict[str, set[str]]] = {k: {} for k in self.INDEXES}
+        self.birthday_version = 0  # змінюється при кожній зміні днів народження
+        self._subscribers: list = []
+        super().__init__(*args, **kwargs)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("_subscribers", None)
+        state.pop("_indexes", None)  # перебудовуються в __setstate__
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Відновлення з pickle: індекси перебудовуються (старі файли їх не мають)."""
+        self.__dict__.update(state)
+        self.__dict__.setdefault("birthday_version", 0)
+        self._subscribers = []
+        self._indexes = {k: {} for k in self.INDEXES}
+        for rec in self.data.values():
+            rec._book = self
+            self._index(rec)
+
+    # --- dict-операції проходять через CRUD, щоб індекси лишались узгодженими ---
+    def __setitem__(self, name: str, record: Record) -> None:
+        if name != record.name.value:
+            raise KeyError("Ключ має збігатися з ім’ям контакту.")
+        if self.data.get(name) is record:
+            return
+        self.add_record(record)
+
+    def __delitem__(self, name: str) -> None:
+        self.delete_record(name)
+
+    # --- індекси ---
+    @classmethod
+    def _tokens(cls, text: str) -> set[str]:
+        return set(cls.TOKEN_RE.findall(text.lower()))
+
+    @classmethod
+    def _index_keys(cls, rec: Record) -> list[tuple[str, str]]:
+        """Пари (індекс, ключ), під якими запис має бути проіндексований."""
+        keys = [("phone", p.value) for p in rec.phones]
+        if rec.phones:
+            keys.append(("has", "phone"))
+        if rec.email:
+            keys.append(("domain", rec.email.value.rsplit("@", 1)[-1].lower()))
+            keys.append(("has", "email"))
+        if rec.address:
+            keys.extend(("address", t) for t in cls._tokens(rec.address.value))
+            keys.append(("has", "address"))
+        if rec.birthday:
+            keys.append(("has", "birthday"))
+        return keys
+
+    def _index(self, rec: Record) -> None:
+        for index, key in self._index_keys(rec):
+            self._indexes[index].setdefault(key, set()).add(rec.name.value)
+
+    def _unindex(self, rec: Record) -> None:
+        for index, key in self._index_keys(rec):
+            names = self._indexes[index].get(key)
+            if names is not None:
+                names.discard(rec.name.value)
+                if not names:
+                    del self._indexes[index][key]
+
+    def _birthdays_changed(self) -> None:
+        self.birthday_version += 1
+
+    # --- підписники ---
+    def subscribe(self, subscriber) -> None:
+        """Підписує об’єкт на каскадні події (rename_contact / remove_contact)."""
+        if subscriber not in self._subscribers:
+            self._subscribers.append(subscriber)
+
+    def _notify(self, event: str, *args) -> None:
+        for subscriber in self._subscribers:
+            getattr(subscriber, event)(*args)
+
     # --- перевірки ---
     def has_contact(self, name: str) -> bool:
         return name in self.data
 
     def find_by_phone(self, phone_value: str) -> Record | None:
-        """Шукає контакт за номером телефону."""
-        return next(
-            (rec for rec in self.data.values() if any(p.value == phone_value for p in rec.phones)),
-            None
-        )
+        """Шукає контакт за номером телефону (через індекс)."""
+        names = self._indexes["phone"].get(phone_value.strip())
+        return self.data[next(iter(names))] if names else None
 
     # --- CRUD ---
     def add_record(self, record: Record) -> None:
@@ -139,15 +281,73 @@ class AddressBook(UserDict):
             if found:
                 raise ValueError(f"Номер {p.value} вже використовується контактом '{found.name.value}'.")
         self.data[record.name.value] = record
+        record._book = self
+        self._index(record)
+        if record.birthday:
+            self._birthdays_changed()
 
     def delete_record(self, name: str) -> None:
-        """Видаляє контакт за іменем."""
+        """Видаляє контакт за іменем (підписники прибирають зв’язки з ним)."""
+        self._remove(name)
+        self._notify("remove_contact", name)
+
+    def _remove(self, name: str) -> None:
         if name not in self.data:
             raise KeyError("Контакт не знайдено.")
-        del self.data[name]
+        rec = self.data.pop(name)
+        self._unindex(rec)
+        rec._book = None
+        if rec.birthday:
+            self._birthdays_changed()
+
+    def rename_record(self, old_name: str, new_name: str) -> Record:
+        """Перейменовує контакт зі збереженням унікальності імені."""
+        new_name = new_name.strip()
+        if not new_name:
+            raise ValueError("Ім’я не може бути порожнім.")
+        if old_name not in self.data:
+            raise KeyError("Контакт не знайдено.")
+        if new_name in self.data:
+            raise KeyError("Контакт з таким ім’ям уже існує.")
+        rec = self.data.pop(old_name)
+        self._unindex(rec)
+        rec.name = Name(new_name)
+        self.data[rec.name.value] = rec
+        self._index(rec)
+        if rec.birthday:
+            self._birthdays_changed()
+        self._notify("rename_contact", old_name, rec.name.value)
+        return rec
+
+    def merge_records(self, primary_name: str, duplicate_name: str) -> None:
+        """Зливає дублікат в основний контакт і видаляє дублікат.
+
+        Для підписників це перейменування дубліката в основний контакт.
+
+        Телефони переносяться (вони вже унікальні в межах книги, тож інваріант
+        зберігається), порожні поля основного контакту заповнюються з дубліката.
+        Заповнені поля основного контакту не змінюються — такі конфлікти
+        показує план злиття (dedupe.find_conflicts).
+        """
+        if primary_name == duplicate_name:
+            raise ValueError("Неможливо злити контакт сам із собою.")
+        if primary_name not in self.data or duplicate_name not in self.data:
+            raise KeyError("Контакт не знайдено.")
+        primary, duplicate = self.data[primary_name], self.data[duplicate_name]
+        for p in duplicate.phones:
+            if all(own.value != p.value for own in primary.phones):
+                primary.add_phone(p)
+        if not primary.email and duplicate.email:
+            primary.set_email(duplicate.email)
+        if not primary.address and duplicate.address:
+            primary.set_address(duplicate.address)
+        if not primary.birthday and duplicate.birthday:
+            primary.set_birthday(duplicate.birthday)
+        self._remove(duplicate_name)
+        self._notify("rename_contact", duplicate_name, primary_name)
 
     # --- пошук ---
-    def search(self, query: str) -> list[Record]:
+    def search(self, query: str, records: list[Record] | None = None) -> list[Record]:
         """Пошук у будь-якому полі (ім’я, адреса, email, телефони)."""
         q = query.strip().lower()
         def match(rec: Record):
@@ -158,20 +358,75 @@ class AddressBook(UserDict):
                 *[p.value for p in rec.phones]
             ]
             return any(q in f.lower() for f in fields)
-        return [r for r in self.data.values() if match(r)]
+        pool = self.data.values() if records is None else records
+        return [r for r in pool if match(r)]
+
+    def query(self, expr: str) -> list[Record]:
+        """Структурований пошук через перетин індексів.
+
+        Терми (через пробіл, усі мають виконуватися; ``-`` заперечує терм):
+          email:@corp.com  — домен email (або повна адреса email:ivan@corp.com)
+          address:Kyiv     — слова адреси
+          phone:+380XXXXXXXXX — точний номер телефону
+          has:birthday     — наявність поля (phone, email, address, birthday)
+        Решта слів (зокрема з невідомим префіксом, як ``10:30`` чи ``http://x``)
+        — підрядок у будь-якому полі, як у ``search``; ``-слово`` виключає
+        контакти, що містять це слово.
+        """
+        include: list[set[str]] = []
+        exclude: list[set[str]] = []
+        free_text = []
+        excluded_text = []
+        for term in expr.split():
+            negate = term.startswith("-") and len(term) > 1
+            field, sep, value = (term[1:] if negate else term).partition(":")
+            field = field.lower()
+            if not sep or field not in self.QUERY_FIELDS:
+                (excluded_text if negate else free_text).append(term[1:] if negate else term)
+                continue
+            if not value:
+                raise ValueError(f"Порожнє значення для поля '{field}'.")
+            if field == "email":
+                local, _, domain = value.lower().rpartition("@")
+                names = self._indexes["domain"].get(domain, set())
+                if local:
+                    names = {n for n in names if self.data[n].email.value.lower() == value.lower()}
+            elif field == "address":
+                tokens = self._tokens(value)
+                names = set.intersection(
+                    *(self._indexes["address"].get(t, set()) for t in tokens)
+                ) if tokens else set()
+            elif field == "phone":
+                names = self._indexes["phone"].get(value, set())
+            else:
+                if value.lower() not in self.HAS_FIELDS:
+                    raise ValueError(f"Невідоме поле для has: '{value}'.")
+                names = self._indexes["has"].get(value.lower(), set())
+            (exclude if negate else include).append(names)
+
+        if include:
+            result = set.intersection(*sorted(include, key=len))
+        else:
+            result = set(self.data)
+        for names in exclude:
+            result -= names
+        records = [self.data[n] for n in sorted(result, key=str.lower)]
+        if free_text:
+            records = self.search(" ".join(free_text), records)
+        for word in excluded_text:
+            matched = {id(r) for r in self.search(word, records)}
+            records = [r for r in records if id(r) not in matched]
+        return records
 
     # --- ДН у межах N днів ---
-    def birthdays_within(self, days: int) -> list[tuple[Record, int]]:
+    def birthdays_within(self, days: int, today: date | None = None) -> list[tuple[Record, int]]:
         """Повертає список контактів, у яких день народження через ≤ N днів."""
-        today = date.today()
+        today = today or date.today()
         result = []
         for rec in self.data.values():
             if not rec.birthday:
                 continue
-            bd = rec.birthday.as_date.replace(year=today.year)
-            if bd < today:
-                bd = bd.replace(year=today.year + 1)
-            diff = (bd - today).days
+            diff = rec.birthday.days_until(today)
             if 0 <= diff <= days:
                 result.append((rec, diff))
         return sorted(result, key=lambda x: x[1])
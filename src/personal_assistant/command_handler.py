@@ -1,5 +1,6 @@
 from personal_assistant.addressbook import Name, Address, Email, Birthday, Record
 from personal_assistant.notes import Note
+from personal_assistant.dedupe import build_merge_plan, apply_merge_plan
 from personal_assistant.validator import (
     ask_str, ask_int, ask_existing_contact,
     ask_phone, ask_existing_note, ask_tag, ask_field
@@ -71,18 +72,49 @@ def handle_delete_contact(book):
     return True
 
 
+def handle_rename_contact(book):
+    """Перейменування контакту (нотатки оновлюються каскадно)."""
+    rec = ask_existing_contact(book)
+    if not rec:
+        return False
+    while True:
+        new_name = ask_str("Нове ім'я (або 'exit'):")
+        if new_name is None:
+            return False
+        if book.has_contact(new_name):
+            print("❗ Контакт з таким ім’ям уже існує. Спробуйте ще раз.")
+            continue
+        break
+    book.rename_record(rec.name.value, new_name)
+    print("✏️ Контакт перейменовано.")
+    return True
+
+
+def handle_contact_notes(book, notes):
+    """Показує контакт разом з пов’язаними нотатками."""
+    rec = ask_existing_contact(book)
+    if not rec:
+        return False
+    print(rec)
+    res = notes.notes_for_contact(rec.name.value)
+    print(*[f"  {i}. {n}" for i, n in res], sep="\n") if res else print("  Немає нотаток.")
+    return False
+
+
 def handle_search(book):
-    q = ask_str("Пошук:")
-    res = book.search(q)
+    q = ask_str("Пошук (текст або email:@corp.com address:Kyiv -has:birthday):")
+    if q is None:
+        return False
+    res = book.query(q)
     print(*res, sep="\n") if res else print("Нічого не знайдено.")
     return False
 
 
-def handle_birthdays(book):
+def handle_birthdays(book, scheduler=None):
     days = ask_int("Кількість днів (або 'exit'):")
     if days is None:
         return False
-    res = book.birthdays_within(days)
+    res = scheduler.birthdays_within(days) if scheduler else book.birthdays_within(days)
     if res:
         for rec, d in res:
             print(f"{rec.name.value}: через {d} дн.")
@@ -91,12 +123,52 @@ def handle_birthdays(book):
     return False
 
 
+def handle_dedupe(book):
+    """Пошук дублікатів і злиття з підтвердженням кожної групи."""
+    plan = build_merge_plan(book)
+    if not plan:
+        print("Дублікатів не знайдено.")
+        return False
+    print(
+        f"Знайдено груп: {len(plan)}. Для кожної: y — злити, n — пропустити, "
+        "a — злити всі решту, exit — скасувати все без змін."
+    )
+    accepted = []
+    for i, group in enumerate(plan):
+        print(group)
+        answer = ask_str("Злити? (y/n/a або 'exit'):")
+        if answer is None:
+            print("Скасовано.")
+            return False
+        answer = answer.lower()
+        if answer == "a":
+            accepted.extend(plan[i:])
+            break
+        if answer in {"y", "yes", "так"}:
+            accepted.append(group)
+    if not accepted:
+        print("Скасовано.")
+        return False
+    merged = apply_merge_plan(book, accepted)
+    print(f"🔗 Злито дублікатів: {merged}.")
+    return merged > 0
+
+
 # --- Обробники нотаток ---
-def handle_add_note(notes):
+def handle_add_note(notes, book):
     text = ask_str("Текст:")
     tags = ask_str("Теги через кому (або пусто):", allow_empty=True)
     tag_list = [t.strip() for t in tags.split(",") if t.strip()] if tags else []
-    idx = notes.add_note(Note(text, tag_list))
+    names = ask_str("Контакти через кому (або пусто):", allow_empty=True)
+    contact_list = []
+    for name in (n.strip() for n in names.split(",")) if names else []:
+        if not name:
+            continue
+        if book.has_contact(name):
+            contact_list.append(name)
+        else:
+            print(f"❗ Контакт '{name}' не знайдено — пропущено.")
+    idx = notes.add_note(Note(text, tag_list, contact_list))
     print(f"✅ Нотатку #{idx} збережено.")
     return True
 
@@ -132,6 +204,27 @@ def handle_tag(notes, add=True):
     return True
 
 
+def handle_link_note(notes, book, link=True):
+    """Пов’язує нотатку з контактом або прибирає зв’язок."""
+    picked = ask_existing_note(notes)
+    if picked is None:
+        return False
+    idx, note = picked
+    rec = ask_existing_contact(book)
+    if not rec:
+        return False
+    name = rec.name.value
+    if link and name in note.contacts:
+        print("❗ Нотатку вже пов’язано з цим контактом.")
+        return False
+    if not link and name not in note.contacts:
+        print("❗ Нотатку не пов’язано з цим контактом.")
+        return False
+    (notes.link_contact if link else notes.unlink_contact)(idx, name)
+    print(f"🔗 Зв’язок {'додано' if link else 'видалено'}.")
+    return True
+
+
 def handle_find_notes(notes):
     q = ask_str("Пошук:")
     res = notes.search(q)
@@ -153,7 +246,7 @@ def handle_notes_by_tag(notes):
 
 
 # --- Головний маршрутизатор ---
-def handle_command(cmd: str, book, notes) -> bool:
+def handle_command(cmd: str, book, notes, scheduler=None) -> bool:
     """Повертає True, якщо дані змінювались (для автозбереження)."""
     try:
         contact_cmds = {
@@ -163,18 +256,23 @@ def handle_command(cmd: str, book, notes) -> bool:
             "add-birthday": lambda: handle_add_field(ask_existing_contact(book), Birthday, "Дата ДД.ММ.РРРР (або 'exit'):", "set_birthday"),
             "edit-phone": lambda: handle_edit_phone(book),
             "delete": lambda: handle_delete_contact(book),
+            "rename": lambda: handle_rename_contact(book),
             "show": lambda: print(book),
             "show-contact": lambda: print(book.get(ask_str("Ім'я:")) or "❗ Контакт не знайдено."),
+            "contact-notes": lambda: handle_contact_notes(book, notes),
             "find": lambda: handle_search(book),
-            "birthdays": lambda: handle_birthdays(book),
+            "birthdays": lambda: handle_birthdays(book, scheduler),
+            "dedupe": lambda: handle_dedupe(book),
         }
 
         note_cmds = {
-            "add-note": lambda: handle_add_note(notes),
+            "add-note": lambda: handle_add_note(notes, book),
             "edit-note": lambda: handle_edit_note(notes),
             "delete-note": lambda: handle_delete_note(notes),
             "add-tag": lambda: handle_tag(notes, add=True),
             "remove-tag": lambda: handle_tag(notes, add=False),
+            "link-note": lambda: handle_link_note(notes, book, link=True),
+            "unlink-note": lambda: handle_link_note(notes, book, link=False),
             "find-note": lambda: handle_find_notes(notes),
             "show-notes": lambda: print(notes),
             "show-notes-by-tag": lambda: handle_notes_by_tag(notes),
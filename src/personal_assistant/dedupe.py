@@ -0,0 +1,196 @@
+import difflib
+from collections import defaultdict
+
+from personal_assistant.addressbook import AddressBook, Record
+
+
+# --- Налаштування оцінювання ---
+MERGE_THRESHOLD = 0.5   # мінімальна оцінка, щоб вважати пару дублікатом
+HIGH_CONFIDENCE = 0.7   # від цієї оцінки (два збіги) групи об’єднуються транзитивно
+MAX_BLOCK_SIZE = 100    # більші блоки (надто загальні ключі) пропускаються
+NAME_SIMILARITY = 0.85  # мінімальна схожість імен для нечіткого збігу
+
+# Телефон не враховується: add_record не дозволяє двом контактам мати один номер.
+WEIGHTS = {
+    "name": 0.5,
+    "email": 0.5,
+    "birthday": 0.2,
+}
+
+
+# --- Нормалізація ---
+def normalize_name(name: str) -> str:
+    """Ім’я без урахування регістру та пробілів."""
+    return "".join(name.split()).casefold()
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+# --- Блокування ---
+def blocking_keys(rec: Record) -> set[tuple[str, str]]:
+    """Ключі блоків для запису: лише записи з однаковим ключем порівнюються."""
+    name = normalize_name(rec.name.value)
+    keys = {("name", name)}
+    if rec.email:
+        keys.add(("email", normalize_email(rec.email.value)))
+    if rec.birthday and name:
+        # Сама дата надто загальна, тому поєднується з першою літерою імені
+        keys.add(("birthday", f"{rec.birthday.value}:{name[0]}"))
+    return keys
+
+
+def candidate_pairs(book: AddressBook) -> set[tuple[str, str]]:
+    """Пари імен-кандидатів. Складність ≈ O(n), а не O(n²) на всі пари."""
+    blocks = defaultdict(list)
+    for key, rec in book.data.items():
+        for block in blocking_keys(rec):
+            blocks[block].append(key)
+
+    pairs = set()
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        members = sorted(members)
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                pairs.add((a, b))
+    return pairs
+
+
+# --- Оцінювання ---
+def _name_score(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    matcher = difflib.SequenceMatcher(None, a, b)
+    if matcher.quick_ratio() < NAME_SIMILARITY:
+        return 0.0
+    ratio = matcher.ratio()
+    return ratio if ratio >= NAME_SIMILARITY else 0.0
+
+
+def score_pair(a: Record, b: Record) -> float:
+    """Оцінка схожості двох контактів у межах [0, 1]."""
+    score = WEIGHTS["name"] * _name_score(
+        normalize_name(a.name.value), normalize_name(b.name.value)
+    )
+    if a.email and b.email and normalize_email(a.email.value) == normalize_email(b.email.value):
+        score += WEIGHTS["email"]
+    if a.birthday and b.birthday and a.birthday.value == b.birthday.value:
+        score += WEIGHTS["birthday"]
+    return min(score, 1.0)
+
+
+# --- План злиття ---
+class MergeGroup:
+    """Група дублікатів: основний контакт і ті, що будуть у нього злиті.
+
+    conflicts — поля, де значення дубліката відрізняється від основного
+    і буде відкинуте при злитті (рядки вигляду «Ім’я: email a@x ≠ b@y»).
+    Група з оцінкою нижче HIGH_CONFIDENCE має низьку впевненість (збіг лише
+    за одним полем) і варта ручної перевірки.
+    """
+    def __init__(self, primary: str, duplicates: list[str], score: float, conflicts: list[str] | None = None):
+        self.primary = primary
+        self.duplicates = duplicates
+        self.score = score
+        self.conflicts = conflicts or []
+
+    @property
+    def confidence(self) -> str:
+        return "висока" if self.score >= HIGH_CONFIDENCE else "низька"
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.primary} ⟵ {', '.join(self.duplicates)} "
+            f"(оцінка {self.score:.2f}, впевненість {self.confidence})"
+        ]
+        lines.extend(f"  ⚠️ конфлікт — {c}" for c in self.conflicts)
+        return "\n".join(lines)
+
+
+def find_conflicts(primary: Record, duplicate: Record) -> list[str]:
+    """Поля, які заповнені в обох контактах, але різними значеннями."""
+    conflicts = []
+    for label, attr in (("email", "email"), ("адреса", "address"), ("ДН", "birthday")):
+        ours, theirs = getattr(primary, attr), getattr(duplicate, attr)
+        if ours and theirs and ours.value.casefold() != theirs.value.casefold():
+            conflicts.append(f"{duplicate.name.value}: {label} {ours.value} ≠ {theirs.value}")
+    return conflicts
+
+
+def _completeness(rec: Record) -> int:
+    return len(rec.phones) + sum(1 for f in (rec.email, rec.address, rec.birthday) if f)
+
+
+def _make_group(book: AddressBook, names: list[str], score: float) -> MergeGroup:
+    names.sort(key=lambda n: (-_completeness(book.data[n]), n.lower()))
+    primary = book.data[names[0]]
+    conflicts = [c for n in names[1:] for c in find_conflicts(primary, book.data[n])]
+    return MergeGroup(names[0], names[1:], score, conflicts)
+
+
+def build_merge_plan(book: AddressBook, threshold: float = MERGE_THRESHOLD) -> list[MergeGroup]:
+    """Знаходить групи дублікатів і обирає основний контакт у кожній.
+
+    Пари з високою впевненістю об’єднуються транзитивно; пари з одним збігом
+    (однаковий email або ім’я, що відрізняється лише регістром/пробілами)
+    стають окремими групами з низькою впевненістю, щоб не утворювати ланцюжків.
+    """
+    parent: dict[str, str] = {}
+
+    def find(x: str) -> str:
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while x != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    best: dict[tuple[str, str], float] = {}
+    weak: list[tuple[str, str, float]] = []
+    for a, b in candidate_pairs(book):
+        score = score_pair(book.data[a], book.data[b])
+        if score < threshold:
+            continue
+        if score < HIGH_CONFIDENCE:
+            weak.append((a, b, score))
+            continue
+        best[(a, b)] = score
+        parent.setdefault(a, a)
+        parent.setdefault(b, b)
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+
+    groups = defaultdict(list)
+    for name in parent:
+        groups[find(name)].append(name)
+    scores = defaultdict(float)
+    for (a, _), score in best.items():
+        root = find(a)
+        scores[root] = max(scores[root], score)
+
+    plan = [_make_group(book, names, scores[root]) for root, names in groups.items()]
+    for a, b, score in weak:
+        if a in parent and b in parent and find(a) == find(b):
+            continue  # уже в одній групі з високою впевненістю
+        plan.append(_make_group(book, [a, b], score))
+    return sorted(plan, key=lambda g: (-g.score, g.primary.lower()))
+
+
+def apply_merge_plan(book: AddressBook, plan: list[MergeGroup]) -> int:
+    """Виконує злиття за планом. Повертає кількість видалених дублікатів.
+
+    Контакти, яких уже немає (злиті попередньою групою), пропускаються.
+    """
+    merged = 0
+    for group in plan:
+        if group.primary not in book.data:
+            continue
+        for name in group.duplicates:
+            if name in book.data and name != group.primary:
+                book.merge_records(group.primary, name)
+                merged += 1
+    return merged
@@ -1,16 +1,21 @@
+import argparse
 import difflib
 from personal_assistant.storage import (
     load_addressbook, save_addressbook, load_notes, save_notes,
-    ABOOK_FILE, NOTES_FILE
+    load_schedule, save_schedule,
+    ABOOK_FILE, NOTES_FILE, SCHEDULE_FILE, REMINDERS_FILE
 )
 from personal_assistant.command_handler import handle_command
+from personal_assistant.scheduler import BirthdayScheduler, FileSink, StdoutSink
 
 SAVE_EVERY = 1  # автозбереження кожні N дій
 
 COMMANDS = {
     "add", "add-address", "email", "add-birthday", "edit-phone",
-    "delete", "show", "show-contact", "find", "birthdays",
+    "delete", "rename", "show", "show-contact", "contact-notes", "find",
+    "birthdays", "dedupe",
     "add-note", "edit-note", "delete-note", "add-tag", "remove-tag",
+    "link-note", "unlink-note",
     "find-note", "show-notes", "show-notes-by-tag", "help", "exit", "close"
 }
 
@@ -20,16 +25,21 @@ HELP_TEXT = {
     "email": "Додати/оновити email.",
     "add-birthday": "Додати/оновити день народження.",
     "edit-phone": "Змінити номер телефону (перевірка унікальності).",
-    "delete": "Видалити контакт.",
+    "delete": "Видалити контакт (зв’язки з нотатками теж видаляються).",
+    "rename": "Перейменувати контакт (нотатки оновлюються).",
     "show": "Показати всі контакти.",
     "show-contact": "Показати один контакт.",
-    "find": "Пошук контактів.",
+    "contact-notes": "Показати контакт разом з його нотатками.",
+    "find": "Пошук контактів: текст або поля (email:@corp.com address:Kyiv phone:+380XXXXXXXXX has:birthday; '-' перед терміном або словом — виключити).",
     "birthdays": "Дні народження у найближчі N днів.",
-    "add-note": "Додати нотатку.",
+    "dedupe": "Знайти та злити дублікати контактів.",
+    "add-note": "Додати нотатку (можна пов’язати з контактами).",
     "edit-note": "Редагувати текст нотатки.",
     "delete-note": "Видалити нотатку.",
     "add-tag": "Додати тег до нотатки.",
     "remove-tag": "Видалити тег з нотатки.",
+    "link-note": "Пов’язати нотатку з контактом.",
+    "unlink-note": "Прибрати зв’язок нотатки з контактом.",
     "find-note": "Пошук нотаток за текстом/тегами.",
     "show-notes": "Показати всі нотатки.",
     "show-notes-by-tag": "Показати нотатки певного тегу.",
@@ -56,25 +66,58 @@ def show_save_paths() -> None:
     """Показує, куди збережено дані."""
     print("\n💾 Дані збережено:")
     print(f" • Адресна книга: {ABOOK_FILE}")
-    print(f" • Нотатки:       {NOTES_FILE}\n")
+    print(f" • Нотатки:       {NOTES_FILE}")
+    print(f" • Дайджест ДН:   {SCHEDULE_FILE}\n")
 
 
-def save_all(book, notes):
+def save_all(book, notes, scheduler):
     """Єдина точка збереження — щоб уникнути дублювання."""
     save_addressbook(book)
     save_notes(notes)
+    save_schedule(scheduler.state)
     show_save_paths()
 
 
-def main() -> None:
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="assistant", description="Персональний помічник")
+    parser.add_argument(
+        "--reminders", action="store_true",
+        help="Надіслати сьогоднішні нагадування про ДН і вийти (для cron/планувальника).",
+    )
+    parser.add_argument(
+        "--reminders-file", nargs="?", const=REMINDERS_FILE, default=None,
+        help=f"Писати нагадування у файл замість консолі (типово {REMINDERS_FILE}).",
+    )
+    return parser.parse_args(argv)
+
+
+def run_reminders(sink) -> None:
+    """Одноразовий режим: ще не надіслані нагадування на сьогодні."""
+    book = load_addressbook()
+    scheduler = BirthdayScheduler(book, load_schedule(), sink)
+    scheduler.run_pending()
+    save_schedule(scheduler.state)
+
+
+def main(argv=None) -> None:
     """Основний цикл взаємодії з користувачем."""
+    args = parse_args(argv)
+    sink = FileSink(args.reminders_file) if args.reminders_file else StdoutSink()
+    if args.reminders:
+        run_reminders(sink)
+        return
+
     book = load_addressbook()
     notes = load_notes()
+    notes.attach(book)
+    scheduler = BirthdayScheduler(book, load_schedule(), sink)
     action_count = 0
 
     print("👋 Персональний помічник. Введіть 'help' для списку команд.")
 
     while True:
+        # Нові нагадування (новий день або зміна ДН) надсилаються під час сесії
+        scheduler.run_pending()
         try:
             command = input(">>> ").strip().lower()
         except (EOFError, KeyboardInterrupt):
@@ -99,14 +142,14 @@ def main() -> None:
                 print("❗ Невідома команда. Введіть 'help'.")
             continue
 
-        changed = handle_command(command, book, notes)
+        changed = handle_command(command, book, notes, scheduler)
         if changed:
             action_count += 1
             if action_count >= SAVE_EVERY:
-                save_all(book, notes)
+                save_all(book, notes, scheduler)
                 action_count = 0
 
-    save_all(book, notes)
+    save_all(book, notes, scheduler)
     print("До зустрічі 👋")
 
 
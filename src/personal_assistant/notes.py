@@ -2,12 +2,13 @@ from collections import UserDict
 
 
 class Note:
-    """Одна нотатка: текст + унікальні теги (збереження порядку)."""
+    """Одна нотатка: текст + унікальні теги + пов’язані контакти (за іменем)."""
     
-    def __init__(self, text: str, tags: list[str] | None = None):
+    def __init__(self, text: str, tags: list[str] | None = None, contacts: list[str] | None = None):
         # Використання dict.fromkeys() прибирає дублікати, але зберігає порядок
         self.text = text.strip()
         self.tags = list(dict.fromkeys((tags or [])))
+        self.contacts = list(dict.fromkeys((contacts or [])))
 
     # --- Робота з тегами ---
     def add_tag(self, tag: str) -> None:
@@ -29,11 +30,42 @@ class Note:
     def __str__(self) -> str:
         """Форматований вивід нотатки."""
         tag_str = f" | 🏷️ {', '.join(self.tags)}" if self.tags else ""
-        return f"{self.text}{tag_str}"
+        contact_str = f" | 👤 {', '.join(self.contacts)}" if self.contacts else ""
+        return f"{self.text}{tag_str}{contact_str}"
 
 
 class NotesBook(UserDict):
-    """Колекція нотаток. Ключ — автоінкрементний int."""
+    """Колекція нотаток. Ключ — автоінкрементний int.
+
+    Зв’язки з контактами індексуються в обидва боки: нотатка → контакти
+    (``Note.contacts``) і контакт → ID нотаток (``_by_contact``).
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._by_contact: dict[str, set[int]] = {}
+        super().__init__(*args, **kwargs)
+
+    def __setstate__(self, state: dict) -> None:
+        """Відновлення з pickle: старі файли не мають індексу — будуємо його."""
+        self.__dict__.update(state)
+        self._by_contact = {}
+        for i, note in self.data.items():
+            if not hasattr(note, "contacts"):
+                note.contacts = []
+            self._index(i, note)
+
+    # --- Індекс контактів ---
+    def _index(self, index: int, note: Note) -> None:
+        for name in note.contacts:
+            self._by_contact.setdefault(name, set()).add(index)
+
+    def _unindex(self, index: int, note: Note) -> None:
+        for name in note.contacts:
+            ids = self._by_contact.get(name)
+            if ids is not None:
+                ids.discard(index)
+                if not ids:
+                    del self._by_contact[name]
 
     # --- CRUD ---
     def _require(self, index: int) -> Note:
@@ -48,14 +80,22 @@ class NotesBook(UserDict):
         """Додає нову нотатку, повертає її ID."""
         new_id = max(self.data, default=0) + 1
         self.data[new_id] = note
+        self._index(new_id, note)
         return new_id
 
     def delete_note(self, index: int) -> None:
-        self._require(index)
+        note = self._require(index)
+        self._unindex(int(index), note)
         del self.data[int(index)]
 
-    def edit_note(self, index: int, new_text: str) -> None:
-        self._require(index).edit_text(new_text)
+    def edit_note(self, index: int, new_text: str, contacts: list[str] | None = None) -> None:
+        """Редагує текст; якщо передано contacts — замінює зв’язки з контактами."""
+        note = self._require(index)
+        note.edit_text(new_text)
+        if contacts is not None:
+            self._unindex(int(index), note)
+            note.contacts = list(dict.fromkeys(contacts))
+            self._index(int(index), note)
 
     def add_tag(self, index: int, tag: str) -> None:
         self._require(index).add_tag(tag)
@@ -63,6 +103,48 @@ class NotesBook(UserDict):
     def remove_tag(self, index: int, tag: str) -> None:
         self._require(index).remove_tag(tag)
 
+    # --- Зв’язки з контактами ---
+    def attach(self, book) -> None:
+        """Підписується на події адресної книги і прибирає зв’язки з неіснуючими контактами."""
+        for name in [n for n in self._by_contact if not book.has_contact(n)]:
+            self.remove_contact(name)
+        book.subscribe(self)
+
+    def link_contact(self, index: int, name: str) -> None:
+        """Пов’язує нотатку з контактом."""
+        note = self._require(index)
+        if name not in note.contacts:
+            note.contacts.append(name)
+            self._by_contact.setdefault(name, set()).add(int(index))
+
+    def unlink_contact(self, index: int, name: str) -> None:
+        """Прибирає зв’язок нотатки з контактом."""
+        note = self._require(index)
+        if name in note.contacts:
+            note.contacts.remove(name)
+            ids = self._by_contact[name]
+            ids.discard(int(index))
+            if not ids:
+                del self._by_contact[name]
+
+    def notes_for_contact(self, name: str) -> list[tuple[int, Note]]:
+        """Нотатки контакту за індексом — без перегляду всіх нотаток."""
+        return [(i, self.data[i]) for i in sorted(self._by_contact.get(name, ()))]
+
+    def rename_contact(self, old: str, new: str) -> None:
+        """Каскадне перейменування (або злиття) контакту в пов’язаних нотатках."""
+        ids = self._by_contact.pop(old, set())
+        for i in ids:
+            note = self.data[i]
+            note.contacts = list(dict.fromkeys(new if c == old else c for c in note.contacts))
+        if ids:
+            self._by_contact.setdefault(new, set()).update(ids)
+
+    def remove_contact(self, name: str) -> None:
+        """Каскадне видалення контакту з усіх пов’язаних нотаток."""
+        for i in self._by_contact.pop(name, set()):
+            self.data[i].contacts.remove(name)
+
     # --- Пошук ---
     def search(self, query: str) -> list[tuple[int, Note]]:
         """Пошук за текстом або тегами."""
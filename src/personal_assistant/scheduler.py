@@ -0,0 +1,192 @@
+from bisect import bisect_right
+from datetime import date
+from pathlib import Path
+from typing import Callable
+
+from personal_assistant.addressbook import AddressBook, Record
+
+
+DIGEST_HORIZON = 365      # дайджест покриває рік уперед — тобто всі ДН
+REMIND_DAYS = (0, 1, 7)   # за скільки днів до ДН надсилати нагадування
+
+
+# --- Дайджест ---
+class BirthdayDigest:
+    """Найближчі дні народження, пораховані на конкретний день.
+
+    Зберігає пари (днів до ДН, ім’я), відсортовані за днями, тож вибірка
+    «через ≤ N днів» — це бінарний пошук, а не перегляд усієї книги.
+    """
+    def __init__(self, day: date, version: int, horizon: int, entries: list[tuple[int, str]]):
+        self.day = day
+        self.version = version
+        self.horizon = horizon
+        self.entries = entries
+        self._days = [d for d, _ in entries]
+
+    @classmethod
+    def compute(cls, book: AddressBook, day: date, horizon: int = DIGEST_HORIZON) -> "BirthdayDigest":
+        entries = sorted(
+            (diff, rec.name.value) for rec, diff in book.birthdays_within(horizon, today=day)
+        )
+        return cls(day, book.birthday_version, horizon, entries)
+
+    def is_fresh(self, book: AddressBook, day: date, horizon: int) -> bool:
+        return self.day == day and self.version == book.birthday_version and self.horizon >= horizon
+
+    def within(self, days: int) -> list[tuple[str, int]]:
+        """Імена з ДН через ≤ days днів (у межах горизонту)."""
+        end = bisect_right(self._days, days)
+        return [(name, d) for d, name in self.entries[:end]]
+
+
+class SchedulerState:
+    """Стан планувальника, що зберігається поруч з книгами.
+
+    sent — надіслані нагадування окремо для кожного приймача:
+    ключ приймача → множина (день, ім’я, днів до ДН). Зберігається окремим
+    невеликим файлом (див. storage.save_schedule), тому не входить у pickle стану.
+    """
+    def __init__(self):
+        self.digest: BirthdayDigest | None = None
+        self.day: date | None = None
+        self.sent: dict[str, set[tuple[date, str, int]]] = {}
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("sent", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.sent = {}
+
+    def prune(self, today: date) -> None:
+        """Забуває нагадування за попередні дні."""
+        self.day = today
+        for entries in self.sent.values():
+            entries -= {e for e in entries if e[0] < today}
+
+    def merge_sent(self, sent: dict[str, set[tuple[date, str, int]]]) -> None:
+        """Додає нагадування, надіслані іншим процесом (наприклад, cron під час сесії)."""
+        for key, entries in sent.items():
+            fresh = {e for e in entries if self.day is None or e[0] >= self.day}
+            self.sent.setdefault(key, set()).update(fresh)
+
+    def rename_contact(self, old: str, new: str) -> None:
+        """Переносить надіслані нагадування на нове ім’я, щоб не надсилати їх повторно."""
+        for entries in self.sent.values():
+            moved = {e for e in entries if e[1] == old}
+            entries -= moved
+            entries |= {(day, new, d) for day, _, d in moved}
+
+
+# --- Приймачі нагадувань ---
+class StdoutSink:
+    """Виводить нагадування в консоль."""
+    key = "stdout"
+
+    def emit(self, message: str) -> None:
+        print(message)
+
+
+class FileSink:
+    """Дописує нагадування у файл (по рядку на нагадування)."""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.key = f"file:{self.path.resolve()}"
+
+    def emit(self, message: str) -> None:
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(message + "\n")
+
+
+# --- Планувальник ---
+class BirthdayScheduler:
+    """Раз на день (або після зміни ДН) перераховує дайджест і надсилає нагадування.
+
+    Кожне нагадування надсилається в приймач один раз; приймачі (ключ ``key``)
+    відстежуються окремо, тож консоль і файл не глушать одне одного.
+    Планувальник підписаний на події книги: перейменування чи злиття контакту
+    переносить його надіслані нагадування на нове ім’я.
+    clock — функція, що повертає поточну дату (для тестів підставляється своя).
+    """
+    def __init__(
+        self,
+        book: AddressBook,
+        state: SchedulerState | None = None,
+        sink=None,
+        clock: Callable[[], date] = date.today,
+        horizon: int = DIGEST_HORIZON,
+        remind_days: tuple[int, ...] = REMIND_DAYS,
+    ):
+        self.book = book
+        self.state = state or SchedulerState()
+        self.sink = sink or StdoutSink()
+        self.clock = clock
+        self.horizon = horizon
+        self.remind_days = remind_days
+        self._checked: tuple[date, int] | None = None  # (день, версія ДН) останньої перевірки
+        book.subscribe(self)
+
+    @property
+    def sink_key(self) -> str:
+        return getattr(self.sink, "key", type(self.sink).__name__)
+
+    # --- події книги ---
+    def rename_contact(self, old: str, new: str) -> None:
+        self.state.rename_contact(old, new)
+
+    def remove_contact(self, name: str) -> None:
+        pass  # дайджест оновиться за birthday_version; записи про надіслане застаріють самі
+
+    def digest(self) -> BirthdayDigest:
+        """Актуальний дайджест; перераховується лише якщо застарів."""
+        today = self.clock()
+        digest = self.state.digest
+        if digest is None or not digest.is_fresh(self.book, today, self.horizon):
+            digest = BirthdayDigest.compute(self.book, today, self.horizon)
+            self.state.digest = digest
+        return digest
+
+    def birthdays_within(self, days: int) -> list[tuple[Record, int]]:
+        """Те саме, що AddressBook.birthdays_within, але з дайджесту."""
+        if days > self.horizon:
+            return self.book.birthdays_within(days, today=self.clock())
+        return [(self.book[name], d) for name, d in self.digest().within(days) if name in self.book]
+
+    def _due(self) -> list[tuple[str, int]]:
+        return [
+            (name, d) for name, d in self.digest().within(max(self.remind_days, default=-1))
+            if d in self.remind_days
+        ]
+
+    def _format(self, today: date, name: str, d: int) -> str:
+        when = "сьогодні" if d == 0 else "завтра" if d == 1 else f"через {d} дн"
+        return f"🎂 {today:%d.%m.%Y}: {name} — день народження {when}."
+
+    def due_reminders(self) -> list[str]:
+        """Тексти нагадувань на сьогодні."""
+        today = self.clock()
+        return [self._format(today, name, d) for name, d in self._due()]
+
+    def run_pending(self) -> int:
+        """Надсилає ще не надіслані нагадування на сьогодні. Повертає кількість.
+
+        Перевірка повторюється, коли змінюється день або дні народження в книзі.
+        """
+        today = self.clock()
+        checked = (today, self.book.birthday_version)
+        if self._checked == checked:
+            return 0
+        self._checked = checked
+        self.state.prune(today)
+        sent = self.state.sent.setdefault(self.sink_key, set())
+        count = 0
+        for name, d in self._due():
+            if (today, name, d) in sent:
+                continue
+            self.sink.emit(self._format(today, name, d))
+            sent.add((today, name, d))
+            count += 1
+        return count
@@ -2,6 +2,7 @@ import pickle
 from pathlib import Path
 from personal_assistant.addressbook import AddressBook
 from personal_assistant.notes import NotesBook
+from personal_assistant.scheduler import SchedulerState
 
 
 # --- Шлях до папки застосунку ---
@@ -10,6 +11,9 @@ APP_DIR.mkdir(parents=True, exist_ok=True)
 
 ABOOK_FILE = APP_DIR / "addressbook.pkl"
 NOTES_FILE = APP_DIR / "notes.pkl"
+SCHEDULE_FILE = APP_DIR / "birthdays.pkl"
+SENT_FILE = APP_DIR / "reminders_sent.pkl"
+REMINDERS_FILE = APP_DIR / "reminders.log"
 
 
 # --- Міграція старих pickle-файлів ---
@@ -63,3 +67,19 @@ def save_notes(notes: NotesBook) -> None:
 
 def load_notes() -> NotesBook:
     return load_data(NOTES_FILE, NotesBook)
+
+
+def save_schedule(state: SchedulerState) -> None:
+    """Зберігає стан, не втрачаючи нагадувань, записаних іншим процесом.
+
+    Перечитується лише невеликий файл надісланих нагадувань, а не дайджест.
+    """
+    state.merge_sent(load_data(SENT_FILE, dict))
+    save_data(state, SCHEDULE_FILE)
+    save_data(state.sent, SENT_FILE)
+
+
+def load_schedule() -> SchedulerState:
+    state = load_data(SCHEDULE_FILE, SchedulerState)
+    state.merge_sent(load_data(SENT_FILE, dict))
+    return state